@@ -1,8 +1,21 @@
+import codecs
 import re
 import unicodedata
+from functools import lru_cache
 
-_PATTERN_LEADING_DASH = r'^-*(?P<name>.+)$'
-_REGEX_LEADING_DASH: re.Pattern[str] = re.compile(_PATTERN_LEADING_DASH)
+_NAME_TRANS = str.maketrans(
+    {
+        '"': '',  # Strip double-quotes
+        "'": '',  # Strip single-quotes
+        '/': '-',  # Replace slashes by dashes
+        '?': '',  # Strip question marks
+        '!': '',  # Strip exclamation marks
+    }
+)
+
+_UNESCAPE = codecs.getdecoder('unicode_escape')
+
+_TAG_TRANS = str.maketrans('', '', '-_')
 
 _PATTERN_TAGS = r'^tags:\s*\[(?P<tags>[^\]]+)\]$'
 _REGEX_TAGS: re.Pattern[str] = re.compile(_PATTERN_TAGS, re.MULTILINE)
@@ -11,20 +24,20 @@ _REGEX_TAGS: re.Pattern[str] = re.compile(_PATTERN_TAGS, re.MULTILINE)
 def standardize_note_name(name: str) -> str:
     """Fix the name of a note."""
     return (
-        _REGEX_LEADING_DASH.sub(r'\g<name>', name)  # Strip leading dash
-        .replace('"', '')  # Strip double-quotes
-        .replace("'", '')  # Strip single-quotes
-        .replace('/', '-')  # Replace slashes by dashes
-        .replace('?', '')  # Strip question marks
-        .replace('!', '')  # Strip exclamation marks
+        name.lstrip('-')  # Strip leading dash
+        .translate(_NAME_TRANS)
     )
 
 
+@lru_cache(maxsize=4_096)
 def _standardize_tag(tag: str) -> str:
     """Standardize a tag."""
+    if tag.islower() and '-' not in tag and '_' not in tag:
+        # Already standardized
+        return tag
+
     return (
-        tag.replace('-', '')  # Strip dashes
-        .replace('_', '')  # Strip underscores
+        tag.translate(_TAG_TRANS)  # Strip dashes and underscores
         .lower()  # Lower case
     )
 
@@ -40,17 +53,18 @@ def standardize_tags(content: str) -> str:
         str: The updated content of the note.
     """
     if match := _REGEX_TAGS.search(content):
-        tags = map(
-            lambda t: t.strip().strip("'"),
-            match['tags'].split(','),
-        )
-        for tag in tags:
-            if (tag_new := _standardize_tag(tag)) != tag:
-                content = content.replace(f'#{tag}', f'#{tag_new}')
+        tags = {t.strip().strip("'") for t in match['tags'].split(',')}
+        # Tags to be changed (the longest first, so that a tag doesn't shadow another one it is the prefix of)
+        tags_to_change = sorted((t for t in tags if t and _standardize_tag(t) != t), key=len, reverse=True)
+        if tags_to_change:
+            # Replace all the hashtags of the note in a single pass
+            regex = re.compile('#(' + '|'.join(map(re.escape, tags_to_change)) + ')')
+            content = regex.sub(lambda m: '#' + _standardize_tag(m[1]), content)
 
     return content
 
 
+@lru_cache(maxsize=4_096)
 def normalize_string(text: str) -> str:
     """
     Normalize a string.
@@ -65,8 +79,12 @@ def normalize_string(text: str) -> str:
         str: The normalized string.
     """
     # Normalize the string
-    normalized = ''.join([c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c)])
-    # Convert Unicode escapes
-    unescaped = normalized.encode('utf-8').decode('unicode_escape')
+    normalized = ''.join(c for c in unicodedata.normalize('NFKD', text) if not unicodedata.combining(c))
+    if '\\' not in normalized:
+        # Nothing to unescape
+        return normalized
+
+    # Convert Unicode escapes (the other non-ASCII characters are escaped too, so they are kept as is)
+    unescaped, _ = _UNESCAPE(normalized.encode('latin-1', 'backslashreplace'))
 
     return unescaped
@@ -1,14 +1,18 @@
 import sqlite3
+from collections import defaultdict
 from dataclasses import dataclass
 from datetime import (
     datetime,
     timezone,
 )
+from pathlib import Path
 from typing import (
     Any,
+    DefaultDict,
     Dict,
     List,
     Optional,
+    Tuple,
     Union,
 )
 
@@ -35,8 +39,10 @@ class EvernoteDB:
     __conn: Union[sqlite3.Connection, MaybeNone] = None
     __is_finalized: bool = False
     """Whether the Evernote database has been scanned or not."""
-    _map_title_2_id: Dict[str, List[NoteID]] = {}
+    _map_title_2_id: DefaultDict[str, List[NoteID]] = defaultdict(list)
     """[Note title => Evernote ID]"""
+    _map_title_2_date_2_id: DefaultDict[str, Dict[Optional[datetime], Optional[str]]] = defaultdict(dict)
+    """[Note title => [Date of creation => Evernote ID]] (`None` when the date of creation is ambiguous)"""
     __map_id_2_container: Dict[str, str] = {}
     """[Evernote ID => Note container]"""
 
@@ -52,13 +58,18 @@ class EvernoteDB:
         """
         if database:
             self.__conn = sqlite3.connect(
-                database,
+                # Open database as read-only (Evernote may still be running and writing to it, so keep the locking)
+                Path(database).absolute().as_uri() + '?mode=ro',
                 # No transaction isolation
                 isolation_level=None,
-                # Open database as read-only
                 uri=True,
+                # Allow the use from concurrent migrations
+                check_same_thread=False,
             )
             self.__conn.row_factory = sqlite3.Row
+            # Read the pages through memory-mapping
+            self.__conn.execute('PRAGMA mmap_size=268435456')
+            self.__conn.execute('PRAGMA query_only=ON')
 
     def __del__(self) -> None:
         """Destructor."""
@@ -78,28 +89,55 @@ class EvernoteDB:
         if self.__is_finalized:
             return
 
-        cursor: sqlite3.Cursor = self.__conn.execute('SELECT id, label, created FROM Nodes_Note where deleted IS NULL')
-        rows: List[sqlite3.Row] = cursor.fetchall()
-        for row in rows:
-            title = normalize_string(row['label'])
+        cursor: sqlite3.Cursor = self.__conn.execute('SELECT id, label, created FROM Nodes_Note WHERE deleted IS NULL')
+        # Stream the rows by iterating the cursor instead of loading the whole table at once
+        _from_ts = datetime.fromtimestamp
+        for id, label, created in cursor:
+            title = normalize_string(label)
             note_id = NoteID(
-                row['id'],
-                datetime.fromtimestamp(
-                    int(row['created']) // 1_000,
+                id,
+                _from_ts(
+                    int(created) // 1_000,
                     timezone.utc,
                 ),
             )
 
-            if ids := self._map_title_2_id.get(title):
-                # There may be notes with duplicate names
-                ids.append(note_id)
-            else:
-                self._map_title_2_id[title] = [note_id]
+            # There may be notes with duplicate names
+            self._map_title_2_id[title].append(note_id)
+
+            # Secondary index to disambiguate notes with duplicate names
+            dates = self._map_title_2_date_2_id[title]
+            dates[note_id.date_created] = None if note_id.date_created in dates else note_id.id
 
         cursor.close()
 
         self.__is_finalized = True
 
+    def __resolve_id(
+        self,
+        title: str,
+        date_created: Optional[datetime],
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Resolve the Evernote identifier of a note.
+
+        Returns:
+            Tuple[Optional[str], Optional[str]]: The Evernote identifier, and the reason of the failure if not found.
+        """
+        if note_ids := self._map_title_2_id.get(title):
+            if len(note_ids) == 1:
+                return (note_ids[0].id, None)
+            elif date_created:
+                # Disambiguate notes with duplicate names with the date of creation
+                if id := self._map_title_2_date_2_id[title].get(date_created):
+                    return (id, None)
+
+                return (None, f'Ambiguous not title `{title}`')
+            else:
+                return (None, f"Note ID not found for `{title}` (can't disambiguate)")
+
+        return (None, f'Note ID not found for `{title}`')
+
     def get_id_from_note(
         self,
         title: Optional[str],
@@ -121,22 +159,45 @@ class EvernoteDB:
 
         self.__finalize()
 
-        if note_ids := self._map_title_2_id.get(title):
-            if len(note_ids) == 1:
-                return note_ids[0].id
-            elif date_created:
-                # Disambiguate notes with duplicate names with the date of creation
-                candidates = [n for n in note_ids if n.date_created and n.date_created == date_created]
-                if len(candidates) == 1:
-                    return candidates[0].id
+        id, reason = self.__resolve_id(title, date_created)
+        if reason:
+            logger.warning(reason)
 
-                logger.warning(f'Ambiguous not title `{title}`')
-            else:
-                logger.warning(f"Note ID not found for `{title}` (can't disambiguate)")
-        else:
-            logger.warning(f'Note ID not found for `{title}`')
+        return id
+
+    def get_ids_from_notes(
+        self,
+        queries: List[Tuple[Optional[str], Optional[datetime]]],
+    ) -> Dict[Tuple[Optional[str], Optional[datetime]], Optional[str]]:
+        """
+        Get the Evernote identifiers of several notes at once.
+
+        Args:
+            queries (List[Tuple[Optional[str], Optional[datetime]]]): The titles and dates of creation of the notes.
+
+        Returns:
+            Dict[Tuple[Optional[str], Optional[datetime]], Optional[str]]: [(Title, Date of creation) => Evernote ID]
+        """
+        self.__finalize()
+
+        ids: Dict[Tuple[Optional[str], Optional[datetime]], Optional[str]] = {}
+        failures = 0
+        for query in queries:
+            if query in ids:
+                continue
+
+            title, date_created = query
+            id, reason = self.__resolve_id(title, date_created) if title else (None, None)
+            if reason:
+                logger.info(reason)
+                failures += 1
+
+            ids[query] = id
+
+        if failures:
+            logger.warning(f'Note ID not found for {failures} out of {len(ids)} notes')
 
-        return None
+        return ids
 
     def add_container_id(
         self,
@@ -1,12 +1,20 @@
 import os
 import shutil
+import threading
 import uuid
-from functools import reduce
-from glob import glob
+from collections import defaultdict
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+)
+from functools import lru_cache
 from typing import (
+    DefaultDict,
     Dict,
     List,
     Optional,
+    Set,
     Tuple,
 )
 
@@ -22,7 +30,7 @@ from src.evernote_db import EvernoteDB
 from src.extractors import (
     REGEX_FILE,
     REGEX_IMAGE,
-    REGEXES_NOTE_LINK,
+    extract_evernote_notes_links,
     extract_notes_links,
 )
 from src.logger import logger
@@ -36,11 +44,46 @@ from src.persist import (
     load_note_content,
     save_note_content,
 )
-from src.report import add_report_csv
+from src.report import ReportWriter
 
 _NOTE_FILENAME = 'README.md'
 
 
+@lru_cache(maxsize=8_192)
+def _basename(path: str) -> str:
+    return os.path.basename(path)
+
+
+@lru_cache(maxsize=8_192)
+def _stem(path: str) -> str:
+    return os.path.splitext(path)[0]
+
+
+def _splice_content(
+    content: str,
+    spans: List[Tuple[int, int, str]],
+) -> str:
+    """
+    Replace several portions of a content in a single pass.
+
+    Args:
+        content (str): The content to update.
+        spans (List[Tuple[int, int, str]]): The (non-overlapping) portions to replace (begin, end, replacement).
+
+    Returns:
+        str: The updated content.
+    """
+    parts: List[str] = []
+    last = 0
+    for begin, end, replacement in sorted(spans):
+        parts.append(content[last:begin])
+        parts.append(replacement)
+        last = end
+    parts.append(content[last:])
+
+    return ''.join(parts)
+
+
 class EvernoteMigration:
     """Evernote Migration Class."""
 
@@ -50,6 +93,14 @@ class EvernoteMigration:
     report_only: bool
     keep: bool
     overwrite: bool
+    _notebook_prefix: str
+    """Path to the notebook, with a trailing separator."""
+    _attachments_prefix: str
+    """Path to the attachments folder of the notebook, with a trailing separator."""
+    _existing_notes: Set[str]
+    """Filenames of the notes already present in the notebook (case-folded, as file systems may be case-insensitive)."""
+    _existing_notes_lock: threading.Lock
+    """Lock guarding the filenames of the notes (shared by the concurrent migrations of notes)."""
 
     def __init__(
         self,
@@ -77,6 +128,13 @@ class EvernoteMigration:
         self.report_only = report_only
         self.keep = keep
         self.overwrite = overwrite
+        # Precomputed paths prefixes for the hot paths
+        self._notebook_prefix = self.notebook_path.rstrip(os.sep) + os.sep
+        self._attachments_prefix = self._notebook_prefix + ATTACHMENTS_FOLDER + os.sep
+        self._existing_notes = {
+            f.casefold() for f in os.listdir(self.notebook_path) if f.casefold().endswith(NOTE_EXTENSION)
+        }
+        self._existing_notes_lock = threading.Lock()
 
     def _get_note_filename(
         self,
@@ -88,22 +146,39 @@ class EvernoteMigration:
         Args:
             note_folder (str): The folder of the note.
         """
-        note_name = standardize_note_name(note_folder)
+        base_name = standardize_note_name(note_folder)
+        note_name = base_name
         count = 0
-        while os.path.exists(
-            note_path := os.path.join(
-                self.notebook_path,
-                note_name,
-            )
-            + NOTE_EXTENSION
-        ):
-            if self.overwrite:
-                break
+        with self._existing_notes_lock:
+            # Probe the in-memory listing of the notebook instead of the file system
+            while (note_name + NOTE_EXTENSION).casefold() in self._existing_notes and not self.overwrite:
+                count += 1
+                note_name = f'{base_name}-{count}'
+
+            self._existing_notes.add((note_name + NOTE_EXTENSION).casefold())
+
+        return self._notebook_prefix + note_name + NOTE_EXTENSION
+
+    def _transfer_attachment(
+        self,
+        source_path: str,
+        dest_path: str,
+    ) -> None:
+        """
+        Transfer an attachment to its new place.
 
-            count += 1
-            note_name += f'-{count}'
+        The attachment is moved when the original note is not kept (and both places are on the same device),
+        otherwise it is copied.
 
-        return note_path
+        Args:
+            source_path (str): The path to the original attachment.
+            dest_path (str): The path to the migrated attachment.
+        """
+        if not self.keep and os.stat(source_path).st_dev == os.stat(os.path.dirname(dest_path)).st_dev:
+            os.rename(source_path, dest_path)
+        else:
+            # Kernel-side copy when available (no file mode bits copy)
+            shutil.copyfile(source_path, dest_path)
 
     def _standardize_note(
         self,
@@ -122,51 +197,52 @@ class EvernoteMigration:
         Returns:
             Tuple[NoteMetadata, List[AttachmentMetadata]]
         """
+        logger.info(f'Migrate note `{note_folder}`')
+
         # Read the content of the original note
-        note_path = os.path.join(self.notebook_path, note_folder)
+        note_path = self._notebook_prefix + note_folder + os.sep
 
-        content = load_note_content(os.path.join(note_path, _NOTE_FILENAME))
+        content = load_note_content(note_path + _NOTE_FILENAME)
 
         attachments_metadata: List[AttachmentMetadata] = []
 
+        attachments: Dict[str, str] = {}
+        # Transfers of the attachments (source path, destination path), once the note is converted
+        transfers: List[Tuple[str, str]] = []
+        # Replacements of the references to the assets (begin, end, new reference)
+        spans: List[Tuple[int, int, str]] = []
+
         # Scan the content of the note for local assets
         for regex in [REGEX_FILE, REGEX_IMAGE]:
-            attachments: Dict[str, str] = {}
-
-            matches = list(regex.finditer(content))
-
-            # Process the matches in reverse order to prevent position shift when replacing the name of the assets
-            for match in matches[::-1]:
+            for match in regex.finditer(content):
                 asset_path = match['path']
 
                 if not (asset_path_new := attachments.get(asset_path)):
                     # First-time attachment reference
                     # Set the name of the attachment to a UUID format
-                    _, ext = os.path.splitext(os.path.basename(asset_path))
-                    asset_name = f'{uuid.uuid4()}{ext}'
-                    asset_path_new = os.path.join(ATTACHMENTS_FOLDER, asset_name)
-
-                    if not self.report_only:
-                        # Copy the attachment to the new place
-                        shutil.copy(
-                            os.path.join(note_path, asset_path),
-                            os.path.join(self.notebook_path, asset_path_new),
-                        )
+                    _, ext = os.path.splitext(asset_path)
+                    asset_name = uuid.uuid4().hex + ext
+                    asset_path_new = ATTACHMENTS_FOLDER + os.sep + asset_name
+
+                    asset_source_path = note_path + asset_path
 
                     # Keep the migrated attachment details for later reuse
                     attachments[asset_path] = asset_path_new
 
+                    # Collect the metadata before the attachment is (possibly) moved away
                     attachments_metadata.append(
                         get_attachment_metadata(
                             asset_name,
-                            os.path.join(note_path, asset_path),
+                            asset_source_path,
                         ),
                     )
 
+                    transfers.append((asset_source_path, self._attachments_prefix + asset_name))
+
                 # Update the reference to the attachment
-                pos_begin, pos_end = match.span('path')
-                content = content[:pos_begin] + asset_path_new + content[pos_end:]
+                spans.append((*match.span('path'), asset_path_new))
 
+        content = _splice_content(content, spans)
         content = standardize_tags(content)
 
         # Set the new name of the note
@@ -178,16 +254,37 @@ class EvernoteMigration:
                 content,
             )
 
+            # Transfer the attachments to the new place (the original note stays intact if the conversion fails)
+            for asset_source_path, asset_dest_path in transfers:
+                self._transfer_attachment(
+                    asset_source_path,
+                    asset_dest_path,
+                )
+
         note_metadata = get_note_metadata(
             os.path.basename(single_note_path),
             content,
         )
-        if self.evernote_db.is_connected:
-            note_metadata.id = self.evernote_db.get_id_from_note(
-                note_metadata.title,
-                note_metadata.date_created,
-            )
-            container = os.path.basename(single_note_path)
+
+        return (note_metadata, attachments_metadata)
+
+    def _resolve_notes_ids(
+        self,
+        notes_metadata: List[NoteMetadata],
+    ) -> None:
+        """
+        Resolve the Evernote identifiers of the migrated notes.
+
+        Args:
+            notes_metadata (List[NoteMetadata]): The metadata of the notes.
+        """
+        ids = self.evernote_db.get_ids_from_notes(
+            [(note_metadata.title, note_metadata.date_created) for note_metadata in notes_metadata],
+        )
+
+        for note_metadata in notes_metadata:
+            note_metadata.id = ids[(note_metadata.title, note_metadata.date_created)]
+            container = note_metadata.name
             if note_metadata.id:
                 # Register the ID of the migrated note filename (i.e. container)
                 self.evernote_db.add_container_id(
@@ -195,9 +292,7 @@ class EvernoteMigration:
                     note_metadata.id,
                 )
             else:
-                logger.warning(f'Note ID not found for container `{container}`')
-
-        return (note_metadata, attachments_metadata)
+                logger.info(f'Note ID not found for container `{container}`')
 
     def process(self) -> None:
         """Standardize a notebook."""
@@ -211,105 +306,137 @@ class EvernoteMigration:
             os.remove(self.report_path)
 
         # Scan the notes (one note per folder) and convert them
-        folders = {d for d in next(os.walk(self.notebook_path))[1]} - {ATTACHMENTS_FOLDER}
-        for folder in folders:
-            # Process the note
-            logger.info(f'Migrate note `{folder}`')
-
-            (
-                note_metadata,
-                attachments_metadata,
-            ) = self._standardize_note(folder)
+        notes: List[Tuple[NoteMetadata, List[AttachmentMetadata]]] = []
+        with os.scandir(self.notebook_path) as entries:
+            folders = [e.name for e in entries if e.is_dir(follow_symlinks=False) and e.name != ATTACHMENTS_FOLDER]
+
+        processed_folders: List[str] = []
+
+        try:
+            # The notes are independent from each other (distinct sources and destinations): process them concurrently
+            with ThreadPoolExecutor(max_workers=os.cpu_count() or 4) as executor:
+                futures: Dict[Future[Tuple[NoteMetadata, List[AttachmentMetadata]]], str] = {}
+                for folder in folders:
+                    # Process the note
+                    futures[executor.submit(self._standardize_note, folder)] = folder
+
+                for future in as_completed(futures):
+                    try:
+                        notes.append(future.result())
+                    except BaseException:
+                        # Do not start the notes still queued
+                        executor.shutdown(cancel_futures=True)
+                        raise
+
+                    processed_folders.append(futures[future])
+        finally:
+            # Report the converted notes, even if another note failed, before removing their original folders
+            if self.evernote_db.is_connected:
+                # Resolve all the Evernote identifiers in a single pass
+                self._resolve_notes_ids([note_metadata for note_metadata, _ in notes])
 
             if self.report_path:
-                add_report_csv(
-                    self.report_path,
-                    note_metadata,
-                    attachments_metadata,
-                )
+                with ReportWriter(self.report_path) as report:
+                    for note_metadata, attachments_metadata in notes:
+                        report.write_note(
+                            note_metadata,
+                            attachments_metadata,
+                        )
 
             if not self.report_only and not self.keep:
                 # Remove the original (processed) notes
-                logger.info(f'Delete folder `{folder}`')
+                for folder in processed_folders:
+                    logger.info(f'Delete folder `{folder}`')
 
-                shutil.rmtree(
-                    os.path.join(self.notebook_path, folder),
-                    ignore_errors=True,
-                )
+                    shutil.rmtree(
+                        self._notebook_prefix + folder,
+                        ignore_errors=True,
+                    )
 
-        if not self.report_only:
+        if not self.report_only and self.evernote_db.is_connected:
             # Scan the converted notes (one note per file)
-            self._process_note_links()
-            self._process_backlinks()
-
-    def _process_note_links(self) -> None:
-        if not self.evernote_db.is_connected:
-            return
+            # Load their content once for all the passes [Note path => Content]
+            notes_contents: Dict[str, str] = {
+                note_path: load_note_content(note_path)
+                for note_path in self._list_notes_files()
+            }
+            self._process_note_links(notes_contents)
+            self._process_backlinks(notes_contents)
+
+    def _list_notes_files(self) -> List[str]:
+        """List the paths of the converted notes (one note per file)."""
+        with os.scandir(self.notebook_path) as entries:
+            return [
+                self._notebook_prefix + e.name
+                for e in entries
+                if e.is_file(follow_symlinks=False) and e.name.endswith(NOTE_EXTENSION) and not e.name.startswith('.')
+            ]
+
+    def _process_note_links(
+        self,
+        notes_contents: Dict[str, str],
+    ) -> None:
+        """
+        Replace the Evernote note links by links to the converted notes.
 
+        Args:
+            notes_contents (Dict[str, str]): The content of the converted notes (updated in place).
+        """
         logger.info('Process notes links')
 
-        note_files = glob(os.path.join(self.notebook_path, '*.md'))
-        for note_path in note_files:
-            is_dirty = False
-            content = load_note_content(note_path)
-
-            for regex in REGEXES_NOTE_LINK:
-                matches = list(regex.finditer(content))
-
-                # Process the matches in reverse order to prevent position shift when replacing the note link
-                for match in matches[::-1]:
-                    id = match['id']
-                    if not (single_note_path := self.evernote_db.get_container_from_id(id)):
-                        logger.warning(
-                            f'Container of `{match["label"]}` not found'
-                            f' for note ID `{id}` ({os.path.basename(note_path)})'
-                        )
-                        continue
+        for note_path, content in notes_contents.items():
+            # Replacements of the note links (begin, end, new reference)
+            spans: List[Tuple[int, int, str]] = []
+
+            for label, id, (pos_begin, pos_end) in extract_evernote_notes_links(content):
+                if not (single_note_path := self.evernote_db.get_container_from_id(id)):
+                    logger.warning(
+                        f'Container of `{label}` not found'
+                        f' for note ID `{id}` ({os.path.basename(note_path)})'
+                    )
+                    continue
 
-                    # Update the reference to the note
-                    pos_begin, pos_end = match.span('url')
-                    content = content[:pos_begin] + './' + single_note_path + content[pos_end:]
-                    is_dirty = True
+                # Update the reference to the note
+                spans.append((pos_begin, pos_end, './' + single_note_path))
 
-            if is_dirty and not self.report_only:
+            if spans:
+                content = _splice_content(content, spans)
+                notes_contents[note_path] = content
                 save_note_content(
                     note_path,
                     content,
                 )
 
-    def _process_backlinks(self) -> None:
-        if not self.evernote_db.is_connected:
-            return
+    def _process_backlinks(
+        self,
+        notes_contents: Dict[str, str],
+    ) -> None:
+        """
+        Add backlinks to the converted notes.
 
+        Args:
+            notes_contents (Dict[str, str]): The content of the converted notes.
+        """
         logger.info('Process backlinks')
 
         # Backlinks to add (notes -> [backlink])
-        map_backlinks: Dict[str, List[str]] = {}
+        map_backlinks: DefaultDict[str, List[str]] = defaultdict(list)
 
-        note_files = glob(os.path.join(self.notebook_path, '*.md'))
-        for note_path in note_files:
-            content = load_note_content(note_path)
-            containers = [os.path.basename(c) for c in extract_notes_links(content)]
+        for note_path, content in notes_contents.items():
+            containers = [_basename(c) for c in extract_notes_links(content)]
+            note_name = _basename(note_path)
 
             for container in containers:
-                note_name = os.path.basename(note_path)
-
-                if linked_notes := map_backlinks.get(container):
-                    linked_notes.append(note_name)
-                else:
-                    map_backlinks[container] = [note_name]
+                map_backlinks[container].append(note_name)
 
         for container, backlinks in map_backlinks.items():
-            note_path = os.path.join(self.notebook_path, container)
-            content = load_note_content(note_path)
+            note_path = self._notebook_prefix + container
+            if (content := notes_contents.get(note_path)) is None:
+                content = load_note_content(note_path)
             content = self._inject_backlinks(backlinks, content)
             save_note_content(note_path, content)
 
-        backlinks_count = reduce(
-            lambda x, y: x + len(y),
-            map_backlinks.values(),
-            0,
-        )
+        backlinks_count = sum(map(len, map_backlinks.values()))
         logger.info(f'Created {backlinks_count} backlinks from {len(map_backlinks)} links')
 
     def _inject_backlinks(
@@ -320,7 +447,7 @@ class EvernoteMigration:
         content += '\n---\n\n'
         content += '## Backlinks\n\n'
 
-        backlinks_md = [f'- [{os.path.splitext(backlink)[0]}](./{backlink})\n' for backlink in backlinks]
+        backlinks_md = [f'- [{_stem(backlink)}](./{backlink})\n' for backlink in backlinks]
         content += ''.join(backlinks_md)
 
         return content
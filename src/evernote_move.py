@@ -3,7 +3,6 @@ import shutil
 from datetime import datetime
 from typing import (
     Iterable,
-    List,
     Optional,
     cast,
 )
@@ -11,7 +10,7 @@ from typing import (
 from src.constants import ATTACHMENTS_FOLDER
 from src.logger import logger
 from src.metadata import Note
-from src.report import read_report_csv
+from src.report import iter_report_csv
 
 
 class MoveDuplicateFileError(Exception):
@@ -52,9 +51,6 @@ class EvernoteMove:
 
     def process(self) -> None:
         """Move some notes of a notebook."""
-        notebook_notes = read_report_csv(self.report_path)
-        notes: List[Note] = self._filter_notes(notebook_notes)
-
         # Create the destination folder
         if not os.path.exists(self.dest_path):
             os.mkdir(self.dest_path)
@@ -62,9 +58,9 @@ class EvernoteMove:
         if not os.path.exists(self.dest_attachments_path):
             os.mkdir(self.dest_attachments_path)
 
-        # Move the notes
+        # Move the notes (as the report is read)
         count = 0
-        for note in notes:
+        for note in self._filter_notes(iter_report_csv(self.report_path)):
             if self._move_note(note):
                 count += 1
 
@@ -72,8 +68,8 @@ class EvernoteMove:
 
     def _filter_notes(
         self,
-        notes: List[Note],
-    ) -> List[Note]:
+        notes: Iterable[Note],
+    ) -> Iterable[Note]:
         partition: Iterable[Note] = notes
 
         if self.date_updated:
@@ -83,7 +79,7 @@ class EvernoteMove:
                 partition,
             )
 
-        return list(partition)
+        return partition
 
     def _move_note(
         self,
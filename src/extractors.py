@@ -1,8 +1,11 @@
 import re
 from datetime import datetime
 from typing import (
+    Iterator,
     List,
     Optional,
+    Tuple,
+    cast,
 )
 
 from src.converters import normalize_string
@@ -34,7 +37,14 @@ _PATTERNS_NOTE_LINK = [
     r'\[(?P<label>[^\]]+)\]\((?P<url>https://share\.evernote\.com/note/(?P<id>[a-f0-9\-]{36}))',
 ]
 """Patterns for note links as generated by Evernote."""
-REGEXES_NOTE_LINK: List[re.Pattern[str]] = [re.compile(pattern) for pattern in _PATTERNS_NOTE_LINK]
+REGEX_NOTE_LINK_COMBINED: re.Pattern[str] = re.compile(
+    '|'.join(
+        # Named groups can't be duplicated: suffix them with the index of the pattern
+        f'(?P<link_{index}>' + re.sub(r'\(\?P<(\w+)>', rf'(?P<\1_{index}>', pattern) + ')'
+        for index, pattern in enumerate(_PATTERNS_NOTE_LINK)
+    )
+)
+"""All the patterns for note links as generated by Evernote, matched in a single pass."""
 
 _PATTERN_NOTE_LINK = r'\[(?P<label>[^\]]+)\]\((?P<container>\./.+\.md)\)'
 """Patterns for migrated note links."""
@@ -94,3 +104,23 @@ def extract_notes_links(content: str) -> List[str]:
         content (str): The content of the note.
     """
     return [match['container'] for match in _REGEX_NOTE_LINK.finditer(content)]
+
+
+def extract_evernote_notes_links(content: str) -> Iterator[Tuple[str, str, Tuple[int, int]]]:
+    """
+    Extract the links to notes, as generated by Evernote, from a note.
+
+    Args:
+        content (str): The content of the note.
+
+    Returns:
+        Iterator[Tuple[str, str, Tuple[int, int]]]: The label, the Evernote identifier and the position of the URL.
+    """
+    for match in REGEX_NOTE_LINK_COMBINED.finditer(content):
+        # The enclosing group of the matching pattern is the last one to be closed
+        index = cast(str, match.lastgroup).rsplit('_', 1)[1]
+        yield (
+            match[f'label_{index}'],
+            match[f'id_{index}'],
+            match.span(f'url_{index}'),
+        )
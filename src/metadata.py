@@ -15,7 +15,7 @@ from src.extractors import (
 )
 
 
-@dataclass
+@dataclass(slots=True)
 class NoteMetadata:
     """Note metadata."""
 
@@ -53,7 +53,7 @@ def get_note_metadata(
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class AttachmentMetadata:
     """Attachment metadata."""
 
@@ -78,7 +78,7 @@ def get_attachment_metadata(
     )
 
 
-@dataclass
+@dataclass(slots=True)
 class Note:
     """Note."""
 
@@ -1,3 +1,23 @@
+import locale
+import mmap
+import os
+from typing import Union
+
+_MMAP_THRESHOLD = 1 << 20
+"""Size (in bytes) from which the notes are memory-mapped instead of read."""
+
+
+def _decode_note_content(data: Union[bytes, mmap.mmap]) -> str:
+    # Same encoding as the text mode (see save_note_content)
+    content = str(data, locale.getpreferredencoding(False), 'surrogateescape')
+
+    # Universal newlines (as when reading in text mode)
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+
+    return content
+
+
 def load_note_content(note_path: str) -> str:
     """
     Load the content of a note.
@@ -5,14 +25,17 @@ def load_note_content(note_path: str) -> str:
     Args:
         note_path (str): The path to the note.
     """
-    with open(
-        note_path,
-        'r',
-        errors='surrogateescape',
-    ) as file:
-        content = file.read()
+    with open(note_path, 'rb') as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0:
+            return ''
 
-    return content
+        if size < _MMAP_THRESHOLD:
+            return _decode_note_content(file.read())
+
+        # Decode large notes straight from the mapped pages
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            return _decode_note_content(mm)
 
 
 def save_note_content(
@@ -1,9 +1,23 @@
 import csv
+import locale
+import mmap
+import os
+import sys
 from datetime import datetime
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from typing import (
+    Any,
+    Callable,
+    Iterator,
     List,
     Optional,
+    TextIO,
+    Tuple,
 )
+
+from src.logger import logger
 from src.metadata import (
     Note,
     NoteMetadata,
@@ -11,6 +25,13 @@ from src.metadata import (
 )
 
 _DATETIME_FORMAT = r'%Y-%m-%d %H:%M:%S'
+"""Format of the dates in the report (fixed-width, zero-padded fields: YYYY-MM-DD HH:MM:SS)."""
+
+_BUFFER_SIZE = 1 << 20
+"""Size (in bytes) of the write buffer of the report (many lines per write system call)."""
+
+_LINE_TERMINATOR = '\n'
+"""Line terminator of the report (identical on all the platforms)."""
 
 _COL_NOTE_ID = 0
 _COL_NOTE_NAME = _COL_NOTE_ID + 1
@@ -22,17 +43,56 @@ _COL_ATTACHMENT_NAME = _COL_NOTE_SIZE + 1
 _COL_ATTACHMENT_SIZE = _COL_ATTACHMENT_NAME + 1
 
 
+def _csv_escape(value: Any) -> str:
+    """Format a CSV field, quoted only when needed (as `csv.QUOTE_MINIMAL`)."""
+    text = '' if value is None else str(value)
+    if ',' in text or '"' in text or '\n' in text or '\r' in text:
+        return '"' + text.replace('"', '""') + '"'
+
+    return text
+
+
 def _format_datetime(dt: Optional[datetime]) -> Optional[str]:
-    return dt.strftime(_DATETIME_FORMAT) if dt else None
+    # Same as dt.strftime(_DATETIME_FORMAT), without the format parsing
+    return dt and f'{dt.year:04d}-{dt.month:02d}-{dt.day:02d} {dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}'
 
 
-def add_report_csv(
-    report_path: str,
-    note_metadata: NoteMetadata,
+@lru_cache(maxsize=4_096)
+def _parse_datetime(value: str) -> datetime:
+    # The format (see _DATETIME_FORMAT) is a subset of ISO 8601: parse it in C instead of using strptime
+    return datetime.fromisoformat(value)
+
+
+def _get_note_fields(note_metadata: NoteMetadata) -> Tuple[Any, ...]:
+    """Get the note fields shared by all the lines of a note."""
+    return (
+        note_metadata.id,
+        note_metadata.name,
+        note_metadata.title,
+        _format_datetime(note_metadata.date_created),
+        _format_datetime(note_metadata.date_updated),
+        note_metadata.size,
+    )
+
+
+def _format_note_lines(
+    note_fields: Tuple[Any, ...],
     attachments_metadata: List[AttachmentMetadata],
-) -> None:
+) -> str:
+    """Format the lines of a note (as `csv.writer` would)."""
+    prefix = ','.join(map(_csv_escape, note_fields)) + ','
+    if not attachments_metadata:
+        return prefix + ',' + _LINE_TERMINATOR
+
+    return ''.join(
+        f'{prefix}{_csv_escape(attachment_metadata.name)},{attachment_metadata.size}{_LINE_TERMINATOR}'
+        for attachment_metadata in attachments_metadata
+    )
+
+
+class ReportWriter:
     """
-    Add information on the note to a CSV report.
+    CSV Report Writer Class.
 
     Headers:
 
@@ -47,97 +107,161 @@ def add_report_csv(
 
     There are as many lines per note as there are some attachments.  
     There is only one line for notes without attachments.
+    """
+
+    _file: TextIO
+    _write: Callable[[str], int]
+
+    def __init__(
+        self,
+        report_path: str,
+    ) -> None:
+        """
+        Constructor.
+
+        Args:
+            report_path (str): The path to the CSV report.
+        """
+        # The report is kept open (and buffered) for all the notes
+        self._file = open(report_path, 'a', newline='', buffering=_BUFFER_SIZE)
+        # Bound method used for every note
+        self._write = self._file.write
+
+    def __enter__(self) -> 'ReportWriter':
+        """Enter the runtime context."""
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        """Exit the runtime context."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the report."""
+        self._file.close()
+
+    def write_note(
+        self,
+        note_metadata: NoteMetadata,
+        attachments_metadata: List[AttachmentMetadata],
+    ) -> None:
+        """
+        Add information on the note to the report.
+
+        Args:
+            note_metadata (NoteMetadata): The metadata of the note.
+            attachments_metadata (List[AttachmentMetadata]): The metadata of the attachments.
+        """
+        # Format the lines directly, and write them at once
+        self._write(_format_note_lines(_get_note_fields(note_metadata), attachments_metadata))
+
+
+def add_report_csv(
+    report_path: str,
+    note_metadata: NoteMetadata,
+    attachments_metadata: List[AttachmentMetadata],
+) -> None:
+    """
+    Add information on the note to a CSV report.
+
+    Deprecated: use `ReportWriter` to keep the report open for all the notes.
 
     Args:
         report_path (str): The path to the CSV report.
         note_metadata (NoteMetadata): The metadata of the note.
         attachments_metadata (List[AttachmentMetadata]): The metadata of the attachments.
     """
-    with open(report_path, 'a') as file:
-        writer = csv.writer(file)
-
-        if not attachments_metadata:
-            writer.writerow(
-                (
-                    note_metadata.id,
-                    note_metadata.name,
-                    note_metadata.title,
-                    _format_datetime(note_metadata.date_created),
-                    _format_datetime(note_metadata.date_updated),
-                    note_metadata.size,
-                    None,
-                    None,
-                )
-            )
-        else:
-            for attachment_metadata in attachments_metadata:
-                writer.writerow(
-                    (
-                        note_metadata.id,
-                        note_metadata.name,
-                        note_metadata.title,
-                        _format_datetime(note_metadata.date_created),
-                        _format_datetime(note_metadata.date_updated),
-                        note_metadata.size,
-                        attachment_metadata.name,
-                        attachment_metadata.size,
-                    )
-                )
+    logger.warning('add_report_csv is deprecated, use ReportWriter instead')
+
+    with ReportWriter(report_path) as report:
+        report.write_note(note_metadata, attachments_metadata)
 
 
 def _get_note_metadata_from_line(line: List[str]) -> NoteMetadata:
     return NoteMetadata(
         id=line[_COL_NOTE_ID],
-        name=line[_COL_NOTE_NAME],
+        # Names of notes have a bounded cardinality (and are used as keys by callers)
+        name=sys.intern(line[_COL_NOTE_NAME]),
         title=line[_COL_NOTE_TITLE],
         size=int(line[_COL_NOTE_SIZE]),
         url=None,
-        date_created=datetime.strptime(line[_COL_NOTE_DATE_CREATED], _DATETIME_FORMAT),
-        date_updated=datetime.strptime(line[_COL_NOTE_DATE_UPDATED], _DATETIME_FORMAT),
+        date_created=_parse_datetime(line[_COL_NOTE_DATE_CREATED]),
+        date_updated=_parse_datetime(line[_COL_NOTE_DATE_UPDATED]),
     )
 
 
-def _get_attachment_metadata_from_line(line: List[str]) -> Optional[AttachmentMetadata]:
-    return AttachmentMetadata(
-        line[_COL_ATTACHMENT_NAME],
-        int(line[_COL_ATTACHMENT_SIZE]),
-    ) if line[_COL_ATTACHMENT_NAME] else None
+def _get_note_from_lines(lines: List[List[str]]) -> Note:
+    """Build a note from all its lines (the note fields are read from the first one)."""
+    return Note(
+        _get_note_metadata_from_line(lines[0]),
+        [
+            AttachmentMetadata(
+                line[_COL_ATTACHMENT_NAME],
+                int(line[_COL_ATTACHMENT_SIZE]),
+            )
+            for line in lines
+            if line[_COL_ATTACHMENT_NAME]
+        ],
+    )
 
 
-def read_report_csv(report_path: str) -> List[Note]:
+def _read_report_lines(report_path: str) -> Iterator[List[str]]:
     """
-    Read a CSV report.
+    Read the lines of a CSV report.
+
+    Reports without quoted fields are split straight from the memory-mapped file.
 
     Args:
         report_path (str): The path to the CSV report.
+    """
+    with open(report_path, 'rb') as file:
+        if not (size := os.fstat(file.fileno()).st_size):
+            return
 
-    Returns:
-        List[Note]: The nodes information.
+        with mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b'"') == -1:
+                encoding = locale.getpreferredencoding(False)
+                # Method bound once for all the lines
+                find = mm.find
+                start = 0
+                while start < size:
+                    if (end := find(b'\n', start)) == -1:
+                        end = size
+                    if line := mm[start:end].rstrip(b'\r'):
+                        yield line.decode(encoding).split(',')
+                    start = end + 1
+
+                return
+
+    # Quoted fields (which may contain delimiters or line breaks): rely on the csv module
+    with open(report_path, 'r', newline='') as file:
+        yield from csv.reader(file)
+
+
+def iter_report_csv(report_path: str) -> Iterator[Note]:
     """
-    notes: List[Note] = []
-    note: Optional[Note] = None
+    Iterate over the notes of a CSV report.
+
+    Each note is yielded as soon as all its lines are read.
 
-    with open(report_path, 'r') as file:
-        reader = csv.reader(file)
+    Args:
+        report_path (str): The path to the CSV report.
 
-        for line in reader:
-            attachment: Optional[AttachmentMetadata] = _get_attachment_metadata_from_line(line)
+    Returns:
+        Iterator[Note]: The nodes information.
+    """
+    # The lines of a same note are consecutive: group them by name of note
+    for _, group in groupby(_read_report_lines(report_path), key=itemgetter(_COL_NOTE_NAME)):
+        yield _get_note_from_lines(list(group))
 
-            if not note or note.body.name != line[_COL_NOTE_NAME]:
-                if note:
-                    # Add the completed note
-                    notes.append(note)
-                # Create a new note
-                note = Note(
-                    _get_note_metadata_from_line(line),
-                    [],
-                )
 
-            if attachment:
-                note.attachments.append(attachment)
+def read_report_csv(report_path: str) -> List[Note]:
+    """
+    Read a CSV report.
 
-    if note:
-        # Add the last completed report item
-        notes.append(note)
+    Args:
+        report_path (str): The path to the CSV report.
 
-    return notes
+    Returns:
+        List[Note]: The nodes information.
+    """
+    return list(iter_report_csv(report_path))